@@ -65,6 +65,44 @@ def load_data():
     carat_group_order = ['Liten (< 0.5)', 'Medium (0.5-1.0)', 'Stor (1.0-1.5)', 'Mycket stor (1.5-2.0)', 'Exceptionell (>2.0)']
     df['carat_group'] = pd.Categorical(df['carat_group'], categories=carat_group_order, ordered=True)
 
+    # Flagga avvikande rader en gång vid inläsning (cachas), så att sidofältet
+    # bara behöver slå av/på booleska kolumner vid varje omkörning.
+    # Hjälpfunktionerna ligger här inne så att ändringar i dem ogiltigförklarar cachen
+    depth_tol = 1.0
+    z_threshold = 3.5
+
+    def robust_zscore(values, median, mad):
+        # Modifierad z-poäng (Iglewicz & Hoaglin) - MAD = 0 ger NaN istället för division med noll
+        mad = pd.Series(mad, index=values.index).replace(0, np.nan)
+        return 0.6745 * (values - median) / mad
+
+    # Djup: angivet djup ska stämma med 2 × z/(x + y), uttryckt i procent
+    xy_sum = (df['x'] + df['y']).replace(0, np.nan)
+    depth_calc = 200 * df['z'] / xy_sum
+    df['flag_depth'] = (df['depth'] - depth_calc).abs() > depth_tol
+
+    # Densitet: volym per karat ska ligga nära resten av datasetet
+    density = np.log(df['volume'] / df['carat'])
+    density_median = density.median()
+    density_mad = (density - density_median).abs().median()
+    df['flag_density'] = robust_zscore(density, density_median, density_mad).abs() > z_threshold
+
+    # Pris: residual av log(pris) mot log(karat) inom varje cell av karatgrupp × klarhet,
+    # annars flaggas bara de tyngsta stenarna i varje grupp eftersom priset växer med karat
+    cells = [df['carat_group'], df['clarity']]
+    log_carat = np.log(df['carat'])
+    log_price = np.log(df['price'])
+    carat_dev = log_carat - log_carat.groupby(cells, observed=True).transform('mean')
+    price_dev = log_price - log_price.groupby(cells, observed=True).transform('mean')
+    slope = (
+        (carat_dev * price_dev).groupby(cells, observed=True).transform('sum')
+        / (carat_dev ** 2).groupby(cells, observed=True).transform('sum').replace(0, np.nan)
+    ).fillna(0)
+    residual = price_dev - slope * carat_dev
+    residual_median = residual.groupby(cells, observed=True).transform('median')
+    residual_mad = (residual - residual_median).abs().groupby(cells, observed=True).transform('median')
+    df['flag_price'] = robust_zscore(residual, residual_median, residual_mad).abs() > z_threshold
+
     return df
 
 df = load_data()
@@ -105,8 +143,28 @@ selected_cuts = st.sidebar.multiselect(
     default=df['cut'].unique() 
 )
 
+st.sidebar.header("Datakvalitet")
+include_depth = st.sidebar.checkbox(
+    f"Inkludera avvikande djup ({int(df['flag_depth'].sum())} st)",
+    value=True,
+    help="Angivet djup stämmer inte med 2 × z/(x + y)"
+)
+include_density = st.sidebar.checkbox(
+    f"Inkludera avvikande densitet ({int(df['flag_density'].sum())} st)",
+    value=True,
+    help="Orimlig volym i förhållande till karatvikt"
+)
+include_price = st.sidebar.checkbox(
+    f"Inkludera prisavvikare ({int(df['flag_price'].sum())} st)",
+    value=True,
+    help="Robust z-poäng (MAD) för log(pris) justerat för karat, inom karatgrupp och klarhet"
+)
+
 # Filtrera data baserat på val
 filtered_df = df[
+    (include_depth | ~df['flag_depth']) &
+    (include_density | ~df['flag_density']) &
+    (include_price | ~df['flag_price']) &
     (df['cut'].isin(selected_cuts)) &
     (df['price'] >= min_price) &
     (df['price'] <= max_price) &